@@ -0,0 +1,22 @@
+"""Ahead-of-time build of the route kernels.
+
+Run once per platform with `python build_shortpath_aot.py`. This writes
+the shortpath_aot extension module next to shortpath.py, which then
+imports it in place of the JIT kernels, so no compilation happens at
+startup.
+"""
+from numba.pycc import CC
+
+from shortpath_numba import (
+    GREEDY_ROUTE_SIG, NEAREST_ROUTE_SIG, TWO_OPT_SIG, _greedy_route, _nearest_route, _two_opt,
+)
+
+
+cc = CC("shortpath_aot")
+cc.export("greedy_route", GREEDY_ROUTE_SIG)(_greedy_route.py_func)
+cc.export("nearest_route", NEAREST_ROUTE_SIG)(_nearest_route.py_func)
+cc.export("two_opt", TWO_OPT_SIG)(_two_opt.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
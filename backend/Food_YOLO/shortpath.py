@@ -4,6 +4,34 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import heapq
 from enum import Enum
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+try:
+    # compiled by build_shortpath_aot.py, skips JIT compilation entirely
+    from shortpath_aot import (
+        greedy_route as _greedy_route, nearest_route as _nearest_route, two_opt as _two_opt,
+    )
+except ImportError:
+    from shortpath_numba import _greedy_route, _nearest_route, _two_opt
+
+
+DEFAULT_STOP_DURATION = 15.0  # minutes spent at each pickup/delivery
+ACTION_NAMES = ('pickup', 'delivery')  # indexed by the kernels' PICKUP/DELIVERY codes
+
+
+@lru_cache(maxsize=1 << 16)
+def _pair_distance(lat1: float, lon1: float, cos_lat1: float,
+                   lat2: float, lon2: float, cos_lat2: float) -> float:
+    #haversine distance from radian coordinates, cached per pair
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    
+    a = math.sin(dlat/2)**2 + cos_lat1 * cos_lat2 * math.sin(dlon/2)**2
+    
+    return 12742 * math.asin(math.sqrt(a))  # 2 * earth radius (6371 km)
 
 
 class GoodsType(Enum):
@@ -11,7 +39,7 @@ class GoodsType(Enum):
     MEDICINE = "medicine"
 
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     
     id: str
@@ -19,24 +47,25 @@ class Location:
     latitude: float
     longitude: float
     type: str 
+    _lat_rad: float = field(init=False, repr=False, compare=False)
+    _lon_rad: float = field(init=False, repr=False, compare=False)
+    _cos_lat: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # coordinates never change after construction, so the trig inputs are computed once
+        self._lat_rad = math.radians(self.latitude)
+        self._lon_rad = math.radians(self.longitude)
+        self._cos_lat = math.cos(self._lat_rad)
     
     def distance_to(self, other: 'Location') -> float:
-       #haversine distance
-        R = 6371 
-        
-        lat1, lon1 = math.radians(self.latitude), math.radians(self.longitude)
-        lat2, lon2 = math.radians(other.latitude), math.radians(other.longitude)
-        
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        
-        return R * c
+        # order the endpoints so a->b and b->a share one cache entry
+        a, b = self, other
+        if (b._lat_rad, b._lon_rad) < (a._lat_rad, a._lon_rad):
+            a, b = b, a
+        return _pair_distance(a._lat_rad, a._lon_rad, a._cos_lat, b._lat_rad, b._lon_rad, b._cos_lat)
 
 
-@dataclass
+@dataclass(slots=True)
 class PerishableGoods:
    
     id: str
@@ -57,7 +86,7 @@ class PerishableGoods:
         return time_factor + priority_factor
 
 
-@dataclass
+@dataclass(slots=True)
 class Vehicle:
     
     id: str
@@ -72,17 +101,17 @@ class Vehicle:
         return (distance / self.speed) * 60  # convert hours to minutes
 
 
-@dataclass
+@dataclass(slots=True)
 class RouteStop:
     
     location: Location
     action: str
     goods: PerishableGoods
     arrival_time: float  
-    estimated_duration: float = 15.0  
+    estimated_duration: float = DEFAULT_STOP_DURATION
 
 
-@dataclass
+@dataclass(slots=True)
 class Route:
    
     vehicle: Vehicle
@@ -112,6 +141,11 @@ class Route:
     def total_goods_saved(self) -> float:
        
         return sum(g.quantity for g in self.goods_delivered)
+    
+    @property
+    def signature(self) -> Tuple[Tuple[str, str, str], ...]:
+        # cheap identity of the stop sequence, used to dedupe candidate routes
+        return tuple((s.location.id, s.action, s.goods.id) for s in self.stops)
 
 
 class LogisticsOptimizer:
@@ -119,209 +153,158 @@ class LogisticsOptimizer:
     
     def __init__(self, vehicle: Vehicle):
         self.vehicle = vehicle
+        self._D = None
+        self._loc_index: Dict[str, int] = {}
+    
+    def _collect_locations(self, goods_list: List[PerishableGoods]) -> List[Location]:
+        # unique locations keyed by id, vehicle start first
+        locs = {self.vehicle.current_location.id: self.vehicle.current_location}
+        for goods in goods_list:
+            locs.setdefault(goods.pickup_location.id, goods.pickup_location)
+            locs.setdefault(goods.delivery_location.id, goods.delivery_location)
+        return list(locs.values())
+    
+    def _build_distance_matrix(self, locs: List[Location]) -> np.ndarray:
+        # pairwise haversine distances (km) for all locations in one vectorized pass
+        lat = np.radians(np.array([l.latitude for l in locs], dtype=np.float64))
+        lon = np.radians(np.array([l.longitude for l in locs], dtype=np.float64))
         
-    def optimize_route(self, goods_list: List[PerishableGoods]) -> Route:
-      
-        if not goods_list:
-            return Route(vehicle=self.vehicle)
+        dlat = lat[:, None] - lat[None, :]
+        dlon = lon[:, None] - lon[None, :]
         
-        sorted_goods = sorted(goods_list, key=lambda g: g.urgency_score(), reverse=True)
+        a = np.sin(dlat/2)**2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon/2)**2
+        D = 6371 * 2 * np.arcsin(np.sqrt(a))
         
+        self._D = D
+        self._loc_index = {loc.id: i for i, loc in enumerate(locs)}
+        return D
+    
+    def _goods_arrays(self, goods_list: List[PerishableGoods]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        expiry = np.array([g.time_to_expiry for g in goods_list], dtype=np.float64)
+        window_hi = np.array([g.pickup_time_window[1] for g in goods_list], dtype=np.float64)
+        pickup_idx = np.array([self._loc_index[g.pickup_location.id] for g in goods_list], dtype=np.int32)
+        delivery_idx = np.array([self._loc_index[g.delivery_location.id] for g in goods_list], dtype=np.int32)
+        return expiry, window_hi, pickup_idx, delivery_idx
+    
+    def _build_route(self, goods_list: List[PerishableGoods], stop_loc_idx: np.ndarray,
+                     stop_action: np.ndarray, stop_good: np.ndarray, arrival_times: np.ndarray) -> Route:
+        # turn the kernel's index arrays back into RouteStop objects
         route = Route(vehicle=self.vehicle)
-        current_location = self.vehicle.current_location
-        current_time = 0.0
+        prev = self._loc_index[self.vehicle.current_location.id]
         
+        for loc_i, action, good_i, arrival_time in zip(stop_loc_idx.tolist(), stop_action.tolist(),
+                                                       stop_good.tolist(), arrival_times.tolist()):
+            goods = goods_list[good_i]
+            action = ACTION_NAMES[action]
+            if action == 'pickup':
+                stop = RouteStop(location=goods.pickup_location, action=action,
+                                 goods=goods, arrival_time=arrival_time)
+            else:
+                stop = RouteStop(location=goods.delivery_location, action=action,
+                                 goods=goods, arrival_time=arrival_time)
+                route.goods_delivered.append(goods)
+            route.stops.append(stop)
+            route.total_distance += float(self._D[prev, loc_i])
+            prev = loc_i
         
-        picked_up = set()
-        delivered = set()
+        if route.stops:
+            last = route.stops[-1]
+            route.total_time = last.arrival_time + last.estimated_duration
+        return route
         
-        while len(delivered) < len(sorted_goods):
-            best_action = None
-            best_score = float('-inf')
-            best_goods = None
-            
-           
-            for goods in sorted_goods:
-                if goods.id in delivered:
-                    continue
-                
-               
-                if goods.id not in picked_up:
-                    travel_time = self.vehicle.travel_time(current_location, goods.pickup_location)
-                    arrival_time = current_time + travel_time
-                    
-                  
-                    if arrival_time <= goods.pickup_time_window[1]:
-                      
-                        score = goods.urgency_score() - (travel_time * 0.5)
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_action = 'pickup'
-                            best_goods = goods
-                
-               
-                elif goods.id in picked_up:
-                    travel_time = self.vehicle.travel_time(current_location, goods.delivery_location)
-                    arrival_time = current_time + travel_time
-                    
-                    
-                    if arrival_time <= goods.time_to_expiry:
-                       
-                        score = goods.urgency_score() + 50 - (travel_time * 0.3)
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_action = 'delivery'
-                            best_goods = goods
-            
-           
-            if best_action is None:
-                break
-            
-         
-            if best_action == 'pickup':
-                travel_time = self.vehicle.travel_time(current_location, best_goods.pickup_location)
-                current_time += travel_time
-                
-                stop = RouteStop(
-                    location=best_goods.pickup_location,
-                    action='pickup',
-                    goods=best_goods,
-                    arrival_time=current_time
-                )
-                route.stops.append(stop)
-                picked_up.add(best_goods.id)
-                
-                current_location = best_goods.pickup_location
-                current_time += stop.estimated_duration
-                route.total_distance += self.vehicle.current_location.distance_to(current_location) if len(route.stops) == 1 else stop.location.distance_to(current_location)
-                
-            else:  
-                travel_time = self.vehicle.travel_time(current_location, best_goods.delivery_location)
-                current_time += travel_time
-                
-                stop = RouteStop(
-                    location=best_goods.delivery_location,
-                    action='delivery',
-                    goods=best_goods,
-                    arrival_time=current_time
-                )
-                route.stops.append(stop)
-                delivered.add(best_goods.id)
-                route.goods_delivered.append(best_goods)
-                
-                current_location = best_goods.delivery_location
-                current_time += stop.estimated_duration
+    def optimize_route(self, goods_list: List[PerishableGoods]) -> Route:
+      
+        if not goods_list:
+            return Route(vehicle=self.vehicle)
         
-        route.total_time = current_time
-        return route
+        # score every good once; stable argsort keeps sorted(reverse=True) tie order
+        urgency = np.array([g.urgency_score() for g in goods_list], dtype=np.float64)
+        order = np.argsort(-urgency, kind='stable')
+        sorted_goods = [goods_list[i] for i in order.tolist()]
+        urgency = urgency[order]
+        
+        D = self._build_distance_matrix(self._collect_locations(sorted_goods))
+        expiry, window_hi, pickup_idx, delivery_idx = self._goods_arrays(sorted_goods)
+        start_idx = self._loc_index[self.vehicle.current_location.id]
+        
+        stops = _greedy_route(D, urgency, expiry, window_hi, pickup_idx, delivery_idx,
+                              float(self.vehicle.speed), DEFAULT_STOP_DURATION, start_idx)
+        return self._build_route(sorted_goods, *stops)
     
     def calculate_all_paths(self, goods_list: List[PerishableGoods]) -> Dict[str, List[Tuple[Location, float]]]:
       
-        all_locations = set()
-        all_locations.add(self.vehicle.current_location)
-        
-        for goods in goods_list:
-            all_locations.add(goods.pickup_location)
-            all_locations.add(goods.delivery_location)
+        locations_list = self._collect_locations(goods_list)
+        D = self._build_distance_matrix(locations_list).tolist()
         
         paths = {}
-        locations_list = list(all_locations)
         
-        for i, loc1 in enumerate(locations_list):
-            for loc2 in locations_list[i+1:]:
-                distance = loc1.distance_to(loc2)
-                key = f"{loc1.id} -> {loc2.id}"
-                paths[key] = [(loc1, 0), (loc2, distance)]
+        for i, j in combinations(range(len(locations_list)), 2):
+            loc1, loc2 = locations_list[i], locations_list[j]
+            key = f"{loc1.id} -> {loc2.id}"
+            paths[key] = [(loc1, 0), (loc2, D[i][j])]
         
         return paths
     
     def find_k_shortest_routes(self, goods_list: List[PerishableGoods], k: int = 3) -> List[Route]:
         
+        best = self._two_opt_improve(self.optimize_route(goods_list))
+        if k == 1:
+            return [best] if best.stops else []
+        
         routes = []
+        seen = set()
         
+        candidates = (
+            best,
+            self._two_opt_improve(self._optimize_by_distance(goods_list)),
+            self._two_opt_improve(self._optimize_by_time_window(goods_list)),
+        )
         
-        route1 = self.optimize_route(goods_list)
-        if route1.stops:
-            routes.append(route1)
+        for route in candidates:
+            if not route.stops:
+                continue
+            signature = route.signature
+            if signature not in seen:
+                seen.add(signature)
+                routes.append(route)
         
+    
+        routes.sort(key=lambda r: (r.total_goods_saved(), -r.total_time), reverse=True)
+        return routes[:k]
+    
+    def _two_opt_improve(self, route: Route) -> Route:
         
-        route2 = self._optimize_by_distance(goods_list)
-        if route2.stops and route2 != route1:
-            routes.append(route2)
+        if len(route.stops) < 3:
+            return route
         
+        goods_list = list({s.goods.id: s.goods for s in route.stops}.values())
+        good_pos = {g.id: i for i, g in enumerate(goods_list)}
+        D = self._build_distance_matrix(self._collect_locations(goods_list))
         
-        route3 = self._optimize_by_time_window(goods_list)
-        if route3.stops and route3 not in routes:
-            routes.append(route3)
+        expiry, window_hi, _, _ = self._goods_arrays(goods_list)
+        quantity = np.array([g.quantity for g in goods_list], dtype=np.float64)
+        stop_loc_idx = np.array([self._loc_index[s.location.id] for s in route.stops], dtype=np.int32)
+        stop_action = np.array([ACTION_NAMES.index(s.action) for s in route.stops], dtype=np.int8)
+        stop_good = np.array([good_pos[s.goods.id] for s in route.stops], dtype=np.int32)
+        start_idx = self._loc_index[self.vehicle.current_location.id]
         
-    
-        routes.sort(key=lambda r: (r.total_goods_saved(), -r.total_time), reverse=True)
-        return routes[:k]
+        stops = _two_opt(D, stop_loc_idx, stop_action, stop_good, expiry, window_hi, quantity,
+                         float(self.vehicle.capacity), float(self.vehicle.speed), DEFAULT_STOP_DURATION, start_idx)
+        return self._build_route(goods_list, *stops)
     
     def _optimize_by_distance(self, goods_list: List[PerishableGoods]) -> Route:
         
-        route = Route(vehicle=self.vehicle)
-        current_location = self.vehicle.current_location
-        current_time = 0.0
-        picked_up = set()
-        delivered = set()
+        if not goods_list:
+            return Route(vehicle=self.vehicle)
         
-        while len(delivered) < len(goods_list):
-            min_distance = float('inf')
-            best_action = None
-            best_goods = None
-            
-            for goods in goods_list:
-                if goods.id in delivered:
-                    continue
-                
-                if goods.id not in picked_up:
-                    distance = current_location.distance_to(goods.pickup_location)
-                    travel_time = (distance / self.vehicle.speed) * 60
-                    
-                    if current_time + travel_time <= goods.pickup_time_window[1]:
-                        if distance < min_distance:
-                            min_distance = distance
-                            best_action = 'pickup'
-                            best_goods = goods
-                
-                elif goods.id in picked_up:
-                    distance = current_location.distance_to(goods.delivery_location)
-                    travel_time = (distance / self.vehicle.speed) * 60
-                    
-                    if current_time + travel_time <= goods.time_to_expiry:
-                        if distance < min_distance - 1: 
-                            min_distance = distance
-                            best_action = 'delivery'
-                            best_goods = goods
-            
-            if best_action is None:
-                break
-            
-            if best_action == 'pickup':
-                travel_time = self.vehicle.travel_time(current_location, best_goods.pickup_location)
-                current_time += travel_time
-                stop = RouteStop(location=best_goods.pickup_location, action='pickup', 
-                               goods=best_goods, arrival_time=current_time)
-                route.stops.append(stop)
-                picked_up.add(best_goods.id)
-                current_location = best_goods.pickup_location
-                current_time += stop.estimated_duration
-            else:
-                travel_time = self.vehicle.travel_time(current_location, best_goods.delivery_location)
-                current_time += travel_time
-                stop = RouteStop(location=best_goods.delivery_location, action='delivery',
-                               goods=best_goods, arrival_time=current_time)
-                route.stops.append(stop)
-                delivered.add(best_goods.id)
-                route.goods_delivered.append(best_goods)
-                current_location = best_goods.delivery_location
-                current_time += stop.estimated_duration
+        D = self._build_distance_matrix(self._collect_locations(goods_list))
         
-        route.total_time = current_time
-        return route
+        expiry, window_hi, pickup_idx, delivery_idx = self._goods_arrays(goods_list)
+        start_idx = self._loc_index[self.vehicle.current_location.id]
+        
+        stops = _nearest_route(D, expiry, window_hi, pickup_idx, delivery_idx,
+                               float(self.vehicle.speed), DEFAULT_STOP_DURATION, start_idx)
+        return self._build_route(goods_list, *stops)
     
     def _optimize_by_time_window(self, goods_list: List[PerishableGoods]) -> Route:
         
@@ -0,0 +1,268 @@
+import heapq
+
+import numpy as np
+from numba import njit
+
+
+# stop action codes, see ACTION_NAMES in shortpath.py
+PICKUP = 0
+DELIVERY = 1
+
+# Explicit signatures make Numba compile at import instead of on the first
+# call, and cache=True reuses that machine code across process launches.
+# build_shortpath_aot.py compiles the same signatures ahead of time.
+_ROUTE_STOPS = "Tuple((i4[::1], i1[::1], i4[::1], f8[::1]))"
+GREEDY_ROUTE_SIG = _ROUTE_STOPS + "(f8[:, ::1], f8[::1], f8[::1], f8[::1], i4[::1], i4[::1], f8, f8, i4)"
+NEAREST_ROUTE_SIG = _ROUTE_STOPS + "(f8[:, ::1], f8[::1], f8[::1], i4[::1], i4[::1], f8, f8, i4)"
+TWO_OPT_SIG = _ROUTE_STOPS + "(f8[:, ::1], i4[::1], i1[::1], i4[::1], f8[::1], f8[::1], f8[::1], f8, f8, f8, i4)"
+
+
+@njit(GREEDY_ROUTE_SIG, cache=True)
+def _greedy_route(D, urgency, expiry, window_hi, pickup_idx, delivery_idx, speed, service_time, start_idx):
+    # urgency-weighted greedy: same scoring as LogisticsOptimizer.optimize_route.
+    # Candidates live in a max-heap keyed by the zero-travel-time upper bound of
+    # their score (urgency for a pickup, urgency + 50 for a delivery), so each
+    # step only evaluates the goods whose bound can still beat the best score.
+    n = urgency.shape[0]
+    picked = np.zeros(n, dtype=np.bool_)
+
+    stop_loc_idx = np.empty(2 * n, dtype=np.int32)
+    stop_action = np.empty(2 * n, dtype=np.int8)
+    stop_good = np.empty(2 * n, dtype=np.int32)
+    arrival_times = np.empty(2 * n, dtype=np.float64)
+
+    if n == 0:
+        return stop_loc_idx, stop_action, stop_good, arrival_times
+
+    heap = [(-urgency[0], 0)]
+    for i in range(1, n):
+        heapq.heappush(heap, (-urgency[i], i))
+    evaluated = np.empty(n, dtype=np.int64)
+
+    m = 0
+    cur = start_idx
+    current_time = 0.0
+
+    while len(heap) > 0:
+        best = -1
+        best_score = -np.inf
+        best_target = cur
+        best_tt = 0.0
+        k = 0
+
+        while len(heap) > 0 and -heap[0][0] >= best_score:
+            i = heapq.heappop(heap)[1]
+
+            if not picked[i]:
+                target = pickup_idx[i]
+                tt = (D[cur, target] / speed) * 60.0
+                if current_time + tt > window_hi[i]:
+                    # time only moves forward and D obeys the triangle
+                    # inequality, so a missed window stays missed
+                    continue
+                score = urgency[i] - (tt * 0.5)
+            else:
+                target = delivery_idx[i]
+                tt = (D[cur, target] / speed) * 60.0
+                if current_time + tt > expiry[i]:
+                    continue
+                score = urgency[i] + 50 - (tt * 0.3)
+
+            evaluated[k] = i
+            k += 1
+            # ties go to the lower index, matching a linear scan in goods order
+            if score > best_score or (score == best_score and i < best):
+                best, best_score, best_target, best_tt = i, score, target, tt
+
+        if best < 0:
+            break
+
+        for j in range(k):
+            i = evaluated[j]
+            if i != best:
+                bound = urgency[i] + 50 if picked[i] else urgency[i]
+                heapq.heappush(heap, (-bound, i))
+
+        current_time += best_tt
+        stop_loc_idx[m] = best_target
+        stop_good[m] = best
+        arrival_times[m] = current_time
+
+        if not picked[best]:
+            stop_action[m] = PICKUP
+            picked[best] = True
+            heapq.heappush(heap, (-(urgency[best] + 50), best))
+        else:
+            stop_action[m] = DELIVERY
+        m += 1
+
+        cur = best_target
+        current_time += service_time
+
+    return stop_loc_idx[:m], stop_action[:m], stop_good[:m], arrival_times[:m]
+
+
+@njit(NEAREST_ROUTE_SIG, cache=True)
+def _nearest_route(D, expiry, window_hi, pickup_idx, delivery_idx, speed, service_time, start_idx):
+    # nearest-next-stop greedy: same selection as LogisticsOptimizer._optimize_by_distance
+    n = expiry.shape[0]
+    picked = np.zeros(n, dtype=np.bool_)
+    # undelivered goods in goods order; order matters for tie-breaking
+    active = np.arange(n).astype(np.int32)
+    n_active = n
+
+    stop_loc_idx = np.empty(2 * n, dtype=np.int32)
+    stop_action = np.empty(2 * n, dtype=np.int8)
+    stop_good = np.empty(2 * n, dtype=np.int32)
+    arrival_times = np.empty(2 * n, dtype=np.float64)
+
+    m = 0
+    cur = start_idx
+    current_time = 0.0
+
+    while n_active > 0:
+        best = -1
+        best_k = -1
+        best_action = PICKUP
+        min_distance = np.inf
+        best_target = cur
+
+        for k in range(n_active):
+            i = active[k]
+
+            if not picked[i]:
+                target = pickup_idx[i]
+                distance = D[cur, target]
+                if current_time + (distance / speed) * 60.0 <= window_hi[i]:
+                    if distance < min_distance:
+                        best, best_k, best_action, min_distance, best_target = i, k, PICKUP, distance, target
+            else:
+                target = delivery_idx[i]
+                distance = D[cur, target]
+                if current_time + (distance / speed) * 60.0 <= expiry[i]:
+                    if distance < min_distance - 1:
+                        best, best_k, best_action, min_distance, best_target = i, k, DELIVERY, distance, target
+
+        if best < 0:
+            break
+
+        current_time += (D[cur, best_target] / speed) * 60.0
+        stop_loc_idx[m] = best_target
+        stop_action[m] = best_action
+        stop_good[m] = best
+        arrival_times[m] = current_time
+        m += 1
+
+        if best_action == PICKUP:
+            picked[best] = True
+        else:
+            for k in range(best_k, n_active - 1):
+                active[k] = active[k + 1]
+            n_active -= 1
+
+        cur = best_target
+        current_time += service_time
+
+    return stop_loc_idx[:m], stop_action[:m], stop_good[:m], arrival_times[:m]
+
+
+@njit(cache=True)
+def _schedule(D, stop_loc_idx, stop_action, stop_good, expiry, window_hi, quantity,
+              max_load, speed, service_time, start_idx, arrival_times):
+    # fill arrival_times for a stop order; False if a window, expiry or load limit breaks
+    load = 0.0
+    current_time = 0.0
+    cur = start_idx
+
+    for s in range(stop_loc_idx.shape[0]):
+        target = stop_loc_idx[s]
+        g = stop_good[s]
+        current_time += (D[cur, target] / speed) * 60.0
+
+        if stop_action[s] == PICKUP:
+            if current_time > window_hi[g]:
+                return False
+            load += quantity[g]
+            if load > max_load:
+                return False
+        else:
+            if current_time > expiry[g]:
+                return False
+            load -= quantity[g]
+
+        arrival_times[s] = current_time
+        cur = target
+        current_time += service_time
+
+    return True
+
+
+@njit(TWO_OPT_SIG, cache=True)
+def _two_opt(D, stop_loc_idx, stop_action, stop_good, expiry, window_hi, quantity,
+             capacity, speed, service_time, start_idx):
+    # 2-opt on an open path: reverse stops[i..j] while that shortens the path
+    # and keeps every pickup ahead of its delivery, within windows/expiry and
+    # no more over capacity than the input route already was
+    m = stop_loc_idx.shape[0]
+    loc = stop_loc_idx.copy()
+    action = stop_action.copy()
+    good = stop_good.copy()
+    arrival_times = np.empty(m, dtype=np.float64)
+
+    max_load = capacity
+    load = 0.0
+    for s in range(m):
+        load += quantity[good[s]] if action[s] == PICKUP else -quantity[good[s]]
+        max_load = max(max_load, load)
+
+    if not _schedule(D, loc, action, good, expiry, window_hi, quantity,
+                     max_load, speed, service_time, start_idx, arrival_times):
+        return loc, action, good, arrival_times
+
+    # seen[g] == stamp marks goods already met inside the current segment
+    seen = np.zeros(expiry.shape[0], dtype=np.int64)
+    stamp = 0
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(m - 1):
+            for j in range(i + 1, m):
+                a = start_idx if i == 0 else loc[i - 1]
+                b = loc[i]
+                c = loc[j]
+                delta = D[a, c] - D[a, b]
+                if j + 1 < m:
+                    d = loc[j + 1]
+                    delta += D[b, d] - D[c, d]
+                if delta >= -1e-9:
+                    continue
+
+                # reversing a segment that holds both ends of a good would
+                # put its delivery before its pickup
+                stamp += 1
+                valid = True
+                for s in range(i, j + 1):
+                    if seen[good[s]] == stamp:
+                        valid = False
+                        break
+                    seen[good[s]] = stamp
+                if not valid:
+                    continue
+
+                loc[i:j + 1] = loc[i:j + 1][::-1].copy()
+                action[i:j + 1] = action[i:j + 1][::-1].copy()
+                good[i:j + 1] = good[i:j + 1][::-1].copy()
+
+                if _schedule(D, loc, action, good, expiry, window_hi, quantity,
+                             max_load, speed, service_time, start_idx, arrival_times):
+                    improved = True
+                else:
+                    loc[i:j + 1] = loc[i:j + 1][::-1].copy()
+                    action[i:j + 1] = action[i:j + 1][::-1].copy()
+                    good[i:j + 1] = good[i:j + 1][::-1].copy()
+
+    # arrival_times may hold a rejected candidate's schedule
+    _schedule(D, loc, action, good, expiry, window_hi, quantity,
+              max_load, speed, service_time, start_idx, arrival_times)
+    return loc, action, good, arrival_times
@@ -28,7 +28,8 @@ results = model.train(
     lr=0.001,                
     project="food_yolov8",  
     name="healthy_rotten",   
-    device=0        
+    device=0,
+    amp=True                 # mixed-precision training
 )
 
 
@@ -48,6 +49,10 @@ print(preds)
 
 
 
-model.export(format="onnx")  
+# TensorRT FP16 engine for GPU serving; int8=True, data="food_data.yaml" gives calibrated INT8
+model.export(format="engine", half=True, dynamic=True, workspace=4, device=0)
+
+# FP16 ONNX for onnxruntime (CUDAExecutionProvider / TensorrtExecutionProvider)
+model.export(format="onnx", half=True, device=0)
 
 
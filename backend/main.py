@@ -1,34 +1,67 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Path, Query, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager, suppress
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId, errors as bson_errors
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.collation import Collation
+import asyncio
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Perishable Food Optimizer API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await prepare_items_collection()
+    yield
+
+app = FastAPI(title="Perishable Food Optimizer API", lifespan=lifespan)
+
+# Compress JSON responses above 1 KB
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # CORS Configuration
+# Credentialed requests can't use a "*" origin, so list the frontends explicitly
+CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000")
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=[origin.strip() for origin in CORS_ORIGINS.split(",") if origin.strip()],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 # MongoDB Configuration
 MONGODB_URL = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "food_optimizer")
 
-client = AsyncIOMotorClient(MONGODB_URL)
+client = AsyncIOMotorClient(
+    MONGODB_URL,
+    maxPoolSize=50,
+    minPoolSize=10,
+    serverSelectionTimeoutMS=5000
+)
 db = client[DB_NAME]
 items_collection = db["items"]
 
+# Case-insensitive equality for category lookups, shared by query and index
+CATEGORY_COLLATION = Collation(locale="en", strength=2)
+
+# Fields read by format_item; everything else stays on the server
+ITEM_FIELDS = ("name", "category", "quantity", "unit", "expiryDate", "location", "addedDate", "consumed")
+ITEM_PROJECTION = dict.fromkeys(ITEM_FIELDS, 1)
+
+# Largest batch POST /api/items/bulk accepts, matching the list endpoints' page limit
+BULK_MAX_ITEMS = 1000
+
 # Pydantic Models
 class FoodItemCreate(BaseModel):
     name: str
@@ -53,22 +86,44 @@ class FoodItemResponse(BaseModel):
     category: str
     quantity: float
     unit: str
-    expiryDate: str
+    # BSON dates; legacy documents may still hold a string
+    expiryDate: Union[datetime, str]
     location: str
-    addedDate: str
+    addedDate: Union[datetime, str]
     consumed: bool
     daysUntilExpiry: int
     status: str
 
+# Declared response models let FastAPI serialize straight to JSON bytes via Pydantic
+class ItemResponse(BaseModel):
+    success: bool
+    item: FoodItemResponse
+
+class ItemListResponse(BaseModel):
+    success: bool
+    items: List[FoodItemResponse]
+    count: int
+    next_cursor: Optional[str] = None
+
+class BulkCreateResponse(BaseModel):
+    success: bool
+    count: int
+    items: List[FoodItemResponse]
+
 # Helper Functions
-def calculate_days_until_expiry(expiry_date: str) -> int:
-    try:
-        expiry = datetime.fromisoformat(expiry_date.replace('Z', '+00:00'))
-        today = datetime.now()
-        diff = expiry - today
-        return diff.days
-    except:
+def parse_date(value: str) -> datetime:
+    # naive local time, matching datetime.now() used for the day arithmetic
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+def calculate_days_until_expiry(expiry_date, now: Optional[datetime] = None) -> int:
+    # legacy documents can still hold an expiryDate string the migration couldn't parse
+    if not isinstance(expiry_date, datetime):
         return 0
+    diff = expiry_date - (now or datetime.now())
+    return diff.days
 
 def get_expiry_status(days_until_expiry: int) -> str:
     if days_until_expiry < 0:
@@ -80,8 +135,9 @@ def get_expiry_status(days_until_expiry: int) -> str:
     else:
         return "good"
 
-def format_item(item: dict) -> dict:
-    days = calculate_days_until_expiry(item["expiryDate"])
+def format_item(item: dict, now: Optional[datetime] = None, days: Optional[int] = None) -> dict:
+    if days is None:
+        days = calculate_days_until_expiry(item["expiryDate"], now)
     return {
         "id": str(item["_id"]),
         "name": item["name"],
@@ -96,6 +152,90 @@ def format_item(item: dict) -> dict:
         "status": get_expiry_status(days)
     }
 
+def format_items(items: list, now: datetime) -> list:
+    # one clock read for the whole batch
+    return [format_item(item, now) for item in items]
+
+def build_item(item: FoodItemCreate, now: datetime) -> dict:
+    # raises ValueError for an unparseable expiryDate
+    return {
+        "_id": ObjectId(),
+        "name": item.name,
+        "category": item.category,
+        "quantity": item.quantity,
+        "unit": item.unit,
+        "expiryDate": parse_date(item.expiryDate),
+        "location": item.location,
+        "addedDate": now,
+        "consumed": False
+    }
+
+def page_cursor(items: list, limit: int) -> Optional[str]:
+    # a full page may have more after it; the next page starts past its last _id
+    if len(items) < limit:
+        return None
+    return str(items[-1]["_id"])
+
+# Startup
+# A migration claim older than this is treated as abandoned (crashed or killed worker)
+MIGRATION_LEASE = timedelta(minutes=10)
+
+async def migrate_legacy_items():
+    # Runs once across workers and boots: the marker is claimed when missing or
+    # when an unfinished claim has gone stale, and is done once finishedAt is set.
+    # Workers that don't hold the claim wait for it to finish before serving.
+    migrations = db["migrations"]
+    while True:
+        now = datetime.now()
+        try:
+            await migrations.update_one(
+                {"_id": "item_dates", "finishedAt": {"$exists": False}, "startedAt": {"$lt": now - MIGRATION_LEASE}},
+                {"$set": {"startedAt": now}},
+                upsert=True
+            )
+            break
+        except DuplicateKeyError:
+            # another worker holds a live claim, or the migration is done
+            marker = await migrations.find_one({"_id": "item_dates"})
+            if marker is not None and "finishedAt" in marker:
+                return
+            await asyncio.sleep(1)
+    
+    try:
+        # every step is idempotent, so a retaken claim can safely redo them.
+        # Dates used to be stored as ISO strings; convert leftovers to BSON dates.
+        # Unparseable ones stay strings and read as 0 days until expiry.
+        for field in ("expiryDate", "addedDate", "consumedDate"):
+            async for item in items_collection.find({field: {"$type": "string"}}, {field: 1}):
+                try:
+                    value = parse_date(item[field])
+                except ValueError:
+                    continue
+                await items_collection.update_one({"_id": item["_id"]}, {"$set": {field: value}})
+        await items_collection.update_many({"consumed": {"$exists": False}}, {"$set": {"consumed": False}})
+    except Exception:
+        # release the claim so the next boot retries instead of waiting out the lease
+        with suppress(Exception):
+            await migrations.delete_one({"_id": "item_dates", "finishedAt": {"$exists": False}})
+        raise
+    
+    await migrations.update_one({"_id": "item_dates"}, {"$set": {"finishedAt": datetime.now()}})
+
+async def prepare_items_collection():
+    # open the pool now so the first request doesn't pay for connecting
+    await client.admin.command("ping")
+    await migrate_legacy_items()
+    await items_collection.create_indexes([
+        # /api/expiring pages in (expiryDate, _id) order, so _id finishes the sort key
+        IndexModel([("consumed", 1), ("expiryDate", 1), ("_id", 1)]),
+        IndexModel(
+            [("category", 1), ("consumed", 1), ("_id", 1)],
+            name="category_ci_consumed_id",
+            collation=CATEGORY_COLLATION
+        ),
+        IndexModel([("name", "text"), ("category", "text"), ("location", "text")])
+    ])
+
 # API Routes
 @app.get("/api/health")
 async def health_check():
@@ -105,58 +245,109 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
-@app.get("/api/items")
-async def get_all_items():
+@app.get("/api/items", response_model=ItemListResponse)
+async def get_all_items(limit: int = Query(50, ge=1, le=1000), after: Optional[str] = None):
     try:
-        items = await items_collection.find().to_list(1000)
-        formatted_items = [format_item(item) for item in items]
-        return {"success": True, "items": formatted_items}
+        query = {"_id": {"$gt": ObjectId(after)}} if after else {}
+        items = await items_collection.find(query, ITEM_PROJECTION).sort("_id", 1).limit(limit).to_list(limit)
+        now = datetime.now()
+        formatted_items = format_items(items, now)
+        return {
+            "success": True,
+            "items": formatted_items,
+            "count": len(formatted_items),
+            "next_cursor": page_cursor(items, limit)
+        }
+    except HTTPException:
+        raise
+    except bson_errors.InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/items/{item_id}")
+@app.get("/api/items/{item_id}", response_model=ItemResponse)
 async def get_item(item_id: str):
     try:
-        from bson import ObjectId
-        item = await items_collection.find_one({"_id": ObjectId(item_id)})
+        item = await items_collection.find_one({"_id": ObjectId(item_id)}, ITEM_PROJECTION)
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
         return {"success": True, "item": format_item(item)}
+    except HTTPException:
+        raise
+    except bson_errors.InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid item id")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/items", status_code=status.HTTP_201_CREATED)
+@app.post("/api/items", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_item(item: FoodItemCreate):
     try:
-        from bson import ObjectId
-        new_item = {
-            "_id": ObjectId(),
-            "name": item.name,
-            "category": item.category,
-            "quantity": item.quantity,
-            "unit": item.unit,
-            "expiryDate": item.expiryDate,
-            "location": item.location,
-            "addedDate": datetime.now().isoformat(),
-            "consumed": False
-        }
+        try:
+            new_item = build_item(item, datetime.now())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid expiryDate")
         await items_collection.insert_one(new_item)
         return {"success": True, "item": format_item(new_item)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/items/bulk", response_model=BulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_items_bulk(items: List[FoodItemCreate]):
+    try:
+        if not items:
+            raise HTTPException(status_code=400, detail="No items to create")
+        if len(items) > BULK_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per request")
+        
+        now = datetime.now()
+        new_items = []
+        for index, item in enumerate(items):
+            try:
+                new_items.append(build_item(item, now))
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid expiryDate at index {index}")
+        
+        # one round trip for the whole batch; unordered lets the server keep
+        # going past a failed document instead of stopping at it
+        await items_collection.insert_many(new_items, ordered=False)
+        return {"success": True, "count": len(new_items), "items": format_items(new_items, now)}
+    except HTTPException:
+        raise
+    except BulkWriteError as e:
+        # _ids are generated here, so the caller can be told exactly what was written
+        failed = sorted({error["index"] for error in e.details.get("writeErrors", [])})
+        failed_set = set(failed)
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": f"Inserted {e.details.get('nInserted', 0)} of {len(new_items)} items",
+                "inserted_ids": [str(doc["_id"]) for i, doc in enumerate(new_items) if i not in failed_set],
+                "failed_indexes": failed
+            }
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.put("/api/items/{item_id}")
+@app.put("/api/items/{item_id}", response_model=ItemResponse)
 async def update_item(item_id: str, item: FoodItemUpdate):
     try:
-        from bson import ObjectId
         update_data = {k: v for k, v in item.dict().items() if v is not None}
         
         if not update_data:
             raise HTTPException(status_code=400, detail="No fields to update")
         
+        if "expiryDate" in update_data:
+            try:
+                update_data["expiryDate"] = parse_date(update_data["expiryDate"])
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid expiryDate")
+        
         result = await items_collection.find_one_and_update(
             {"_id": ObjectId(item_id)},
             {"$set": update_data},
+            projection=ITEM_PROJECTION,
             return_document=True
         )
         
@@ -164,110 +355,180 @@ async def update_item(item_id: str, item: FoodItemUpdate):
             raise HTTPException(status_code=404, detail="Item not found")
         
         return {"success": True, "item": format_item(result)}
+    except HTTPException:
+        raise
+    except bson_errors.InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid item id")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/items/{item_id}")
 async def delete_item(item_id: str):
     try:
-        from bson import ObjectId
         result = await items_collection.delete_one({"_id": ObjectId(item_id)})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Item not found")
         return {"success": True, "message": "Item deleted successfully"}
+    except HTTPException:
+        raise
+    except bson_errors.InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid item id")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.patch("/api/items/{item_id}/consume")
+@app.patch("/api/items/{item_id}/consume", response_model=ItemResponse)
 async def consume_item(item_id: str):
     try:
-        from bson import ObjectId
         result = await items_collection.find_one_and_update(
             {"_id": ObjectId(item_id)},
-            {"$set": {"consumed": True, "consumedDate": datetime.now().isoformat()}},
+            {"$set": {"consumed": True, "consumedDate": datetime.now()}},
+            projection=ITEM_PROJECTION,
             return_document=True
         )
         if not result:
             raise HTTPException(status_code=404, detail="Item not found")
         return {"success": True, "item": format_item(result)}
+    except HTTPException:
+        raise
+    except bson_errors.InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid item id")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/expiring/{days}")
-async def get_expiring_items(days: int = 7):
+@app.get("/api/expiring/{days}", response_model=ItemListResponse)
+async def get_expiring_items(days: int = Path(..., ge=0, le=3650), limit: int = Query(50, ge=1, le=1000), after: Optional[str] = None):
     try:
-        items = await items_collection.find({"consumed": False}).to_list(1000)
-        expiring_items = []
+        # 0 <= daysUntilExpiry <= days  <=>  now <= expiryDate < now + (days + 1) days
+        now = datetime.now()
+        query = {
+            "consumed": False,
+            "expiryDate": {"$gte": now, "$lt": now + timedelta(days=days + 1)}
+        }
+        if after:
+            # results are ordered by (expiryDate, _id), so the cursor carries both
+            try:
+                after_expiry, after_id = after.split("_", 1)
+                after_expiry, after_id = datetime.fromisoformat(after_expiry), ObjectId(after_id)
+            except (bson_errors.InvalidId, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query["$or"] = [
+                {"expiryDate": {"$gt": after_expiry}},
+                {"expiryDate": after_expiry, "_id": {"$gt": after_id}}
+            ]
+        
+        items = await items_collection.find(query, ITEM_PROJECTION).sort(
+            [("expiryDate", 1), ("_id", 1)]
+        ).limit(limit).to_list(limit)
         
-        for item in items:
-            days_left = calculate_days_until_expiry(item["expiryDate"])
-            if 0 <= days_left <= days:
-                expiring_items.append(format_item(item))
+        next_cursor = page_cursor(items, limit)
+        if next_cursor:
+            next_cursor = f"{items[-1]['expiryDate'].isoformat()}_{next_cursor}"
         
-        expiring_items.sort(key=lambda x: x["daysUntilExpiry"])
-        return {"success": True, "items": expiring_items, "count": len(expiring_items)}
+        expiring_items = format_items(items, now)
+        return {"success": True, "items": expiring_items, "count": len(expiring_items), "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stats")
 async def get_statistics():
     try:
-        items = await items_collection.find({"consumed": False}).to_list(1000)
+        # status thresholds as dates: days < 0, <= 2, <= 5  <=>  expiryDate < now, now + 3d, now + 6d
+        # (a leftover string expiryDate counts as 0 days, like calculate_days_until_expiry)
+        now = datetime.now()
+        status_expr = {"$switch": {
+            "branches": [
+                {"case": {"$ne": [{"$type": "$expiryDate"}, "date"]}, "then": "critical"},
+                {"case": {"$lt": ["$expiryDate", now]}, "then": "expired"},
+                {"case": {"$lt": ["$expiryDate", now + timedelta(days=3)]}, "then": "critical"},
+                {"case": {"$lt": ["$expiryDate", now + timedelta(days=6)]}, "then": "warning"}
+            ],
+            "default": "good"
+        }}
+        pipeline = [
+            {"$match": {"consumed": False}},
+            {"$project": {"_id": 0, "category": 1, "expiryDate": 1}},
+            {"$facet": {
+                "byStatus": [{"$group": {"_id": status_expr, "n": {"$sum": 1}}}],
+                "byCategory": [{"$group": {"_id": "$category", "n": {"$sum": 1}}}]
+            }}
+        ]
+        
+        facets, consumed = await asyncio.gather(
+            items_collection.aggregate(pipeline).to_list(1),
+            items_collection.count_documents({"consumed": True})
+        )
+        by_status = {row["_id"]: row["n"] for row in facets[0]["byStatus"]}
         
         stats = {
-            "total": len(items),
-            "expired": 0,
-            "critical": 0,
-            "warning": 0,
-            "good": 0,
-            "consumed": await items_collection.count_documents({"consumed": True}),
-            "categories": {}
+            "total": sum(by_status.values()),
+            "expired": by_status.get("expired", 0),
+            "critical": by_status.get("critical", 0),
+            "warning": by_status.get("warning", 0),
+            "good": by_status.get("good", 0),
+            "consumed": consumed,
+            "categories": {row["_id"]: row["n"] for row in facets[0]["byCategory"]}
         }
         
-        for item in items:
-            days = calculate_days_until_expiry(item["expiryDate"])
-            status = get_expiry_status(days)
-            stats[status] += 1
-            
-            category = item["category"]
-            stats["categories"][category] = stats["categories"].get(category, 0) + 1
-        
         return {"success": True, "stats": stats}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/category/{category}")
-async def get_items_by_category(category: str):
+@app.get("/api/category/{category}", response_model=ItemListResponse)
+async def get_items_by_category(category: str, limit: int = Query(50, ge=1, le=1000), after: Optional[str] = None):
     try:
-        items = await items_collection.find({
-            "category": {"$regex": f"^{category}$", "$options": "i"},
-            "consumed": False
-        }).to_list(1000)
+        query = {"category": category, "consumed": False}
+        if after:
+            query["_id"] = {"$gt": ObjectId(after)}
+        items = await items_collection.find(
+            query, ITEM_PROJECTION, collation=CATEGORY_COLLATION
+        ).sort("_id", 1).limit(limit).to_list(limit)
         
-        formatted_items = [format_item(item) for item in items]
-        return {"success": True, "items": formatted_items, "count": len(formatted_items)}
+        now = datetime.now()
+        formatted_items = format_items(items, now)
+        return {"success": True, "items": formatted_items, "count": len(formatted_items), "next_cursor": page_cursor(items, limit)}
+    except HTTPException:
+        raise
+    except bson_errors.InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/search")
-async def search_items(query: str):
+@app.get("/api/search", response_model=ItemListResponse)
+async def search_items(query: str, limit: int = Query(50, ge=1, le=1000), after: Optional[str] = None):
     try:
         if not query:
             raise HTTPException(status_code=400, detail="Search query is required")
         
-        items = await items_collection.find({
-            "$or": [
-                {"name": {"$regex": query, "$options": "i"}},
-                {"category": {"$regex": query, "$options": "i"}},
-                {"location": {"$regex": query, "$options": "i"}}
-            ]
-        }).to_list(1000)
+        # relevance order has no stable key to seek past, so the cursor is an offset
+        try:
+            offset = int(after) if after else 0
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        items = await items_collection.find(
+            {"$text": {"$search": query}},
+            {**ITEM_PROJECTION, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"})]).skip(offset).limit(limit).to_list(limit)
+        
+        next_cursor = str(offset + limit) if len(items) == limit else None
         
-        formatted_items = [format_item(item) for item in items]
-        return {"success": True, "items": formatted_items, "count": len(formatted_items)}
+        now = datetime.now()
+        formatted_items = format_items(items, now)
+        return {"success": True, "items": formatted_items, "count": len(formatted_items), "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # an import string is required for uvicorn to spawn worker processes
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("FASTAPI_PORT", 8000)),
+        workers=int(os.getenv("FASTAPI_WORKERS", 1)),
+    )
@@ -1,18 +1,25 @@
-from pymongo import MongoClient
 from datetime import datetime
 
-# Connect to MongoDB
-client = MongoClient("mongodb://localhost:27017/")  # default local MongoDB
-db = client["food_detection"]  # database
+from main import db
+
 users_collection = db["users"]  # collection
 
-# Create a user document
-user_doc = {
-    "username": "jasmin123",
-    "email": "jasmin@example.com",
-    "created_at": datetime(2026, 2, 8, 0, 0)
-}
 
-# Insert into MongoDB
-result = users_collection.insert_one(user_doc)
-print("Inserted user with ID:", result.inserted_id)
+async def create_user(user_doc: dict):
+    result = await users_collection.insert_one(user_doc)
+    return result.inserted_id
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    # Create a user document
+    user_doc = {
+        "username": "jasmin123",
+        "email": "jasmin@example.com",
+        "created_at": datetime(2026, 2, 8, 0, 0)
+    }
+
+    # Insert into MongoDB
+    inserted_id = asyncio.run(create_user(user_doc))
+    print("Inserted user with ID:", inserted_id)
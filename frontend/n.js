@@ -82,15 +82,24 @@ function updateThemeIcon(theme) {
 async function fetchItems() {
     showLoader();
     try {
-        const response = await fetch(`${API_URL}/items`);
-        const data = await response.json();
-        if (data.success) {
-            foodItems = data.items.filter(item => !item.consumed);
-            renderItems(foodItems);
-            updateStats();
-        } else {
-            showNotification('Error fetching items: ' + data.error, 'danger');
-        }
+        // The API returns items a page at a time; follow next_cursor until done
+        let items = [];
+        let cursor = null;
+        do {
+            const url = cursor ? `${API_URL}/items?after=${cursor}` : `${API_URL}/items`;
+            const response = await fetch(url);
+            const data = await response.json();
+            if (!data.success) {
+                showNotification('Error fetching items: ' + data.error, 'danger');
+                return;
+            }
+            items = items.concat(data.items);
+            cursor = data.next_cursor;
+        } while (cursor);
+
+        foodItems = items.filter(item => !item.consumed);
+        renderItems(foodItems);
+        updateStats();
     } catch (error) {
         showNotification('Network error occurred', 'danger');
     } finally {